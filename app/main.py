@@ -1,6 +1,9 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import analyze
+from fastapi.responses import JSONResponse
+from app.routes import analyze, campaign, packs
+from app.services.prompts import registry as prompt_registry
+from app.services.scheduler import SchedulerRejected, llm_scheduler, request_admission, scrape_scheduler
 
 app = FastAPI(title="Neurobots Marketing Agent API")
 
@@ -10,12 +13,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 
+@app.exception_handler(SchedulerRejected)
+async def scheduler_rejected(request: Request, exc: SchedulerRejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics/scheduler")
+async def scheduler_metrics():
+    """Queue depth and wait-time percentiles for the shared LLM/scrape queues."""
+    return {
+        "llm": llm_scheduler.metrics(),
+        "scrape": scrape_scheduler.metrics(),
+        "admission": request_admission.metrics(),
+    }
+
+
+@app.get("/metrics/prompts")
+async def prompt_metrics():
+    """Prompt versions (cache keys) and static prefix token counts."""
+    return prompt_registry.describe()
+
+
 app.include_router(analyze.router)
+app.include_router(packs.router)
+app.include_router(campaign.router)
@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+# Optional speedups: orjson for plain dict/list payloads, brotli for `br`.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+
+# Bodies smaller than this are sent as-is; compressing them costs more than it saves.
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # dynamic content: 11 is far too slow per request
+
+
+def render_json(content: Any) -> bytes:
+    """
+    Serialize a response payload to compact JSON bytes.
+
+    Pydantic models go through `model_dump_json` (one pass in Rust) instead of
+    FastAPI's default jsonable_encoder + json.dumps path.
+    """
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag computed from the uncompressed response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _accepted_encodings(accept_encoding: str) -> dict:
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick `br` (if brotli is installed) or `gzip` from an Accept-Encoding header."""
+    if not accept_encoding:
+        return None
+    accepted = _accepted_encodings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Compressed representations carry an encoding suffix ("<hash>-gzip");
+    # any representation of the same content counts as a match.
+    base = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"').split("-", 1)[0] == base:
+            return True
+    return False
+
+
+def json_response(
+    request: Request,
+    content: Any = None,
+    body: Optional[bytes] = None,
+    etag: Optional[str] = None,
+    status_code: int = 200,
+) -> Response:
+    """
+    Build a compact, cacheable JSON response.
+
+    - Serializes `content` with `render_json` unless a pre-rendered `body` is given
+    - Answers `If-None-Match` with 304 on GET/HEAD
+    - Compresses bodies over MIN_COMPRESS_SIZE with br/gzip per Accept-Encoding
+    """
+    if body is None:
+        body = render_json(content)
+    etag = etag or make_etag(body)
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "no-cache",  # always revalidate; a 304 is cheap
+    }
+
+    # Negotiate first: a 304 must carry the same validator the 200 would.
+    encoding = None
+    if len(body) >= MIN_COMPRESS_SIZE:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding:
+        headers["ETag"] = etag[:-1] + "-" + encoding + '"'
+
+    if request.method in ("GET", "HEAD") and _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
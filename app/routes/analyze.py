@@ -1,27 +1,64 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from app.responses import json_response
 from app.schemas import AnalyzeRequest, AnalyzeResponse
-from app.services.scraper import fetch_website_text
+from app.services.scraper import scrape_website
 from app.services.brand_profile import generate_brand_profile
+from app.services.pack_store import StoredPack, pack_store
 from app.services.posts import generate_posts
+from app.services.scheduler import SchedulerRejected, client_tenant, request_admission, tenant_context
+from app.services.tone_classifier import resolve_tone_preset
 
 router = APIRouter()
 
 @router.post("/analyze", response_model=AnalyzeResponse)
-async def analyze_website(request: AnalyzeRequest):
+async def analyze_website(
+    request: AnalyzeRequest,
+    http_request: Request,
+    x_api_key: Optional[str] = Header(default=None),
+    x_priority: Optional[str] = Header(default=None),
+):
     """
     Analyze a website URL and generate brand profile + social media posts WITH IMAGES
+
+    LLM and scrape work is queued per tenant (X-API-Key, or the client
+    address for keyless callers) on the lane given
+    by X-Priority ("interactive" by default, or "batch"). Admission is
+    checked here, on the event loop, before the blocking work takes a
+    threadpool thread: a tenant over its in-flight cap gets a 429.
+
+    The pack is stored under a content-hash `pack_id` and returned compressed
+    with an ETag; GET /packs/{pack_id} serves repeat fetches.
     """
+    tenant = client_tenant(x_api_key, http_request.client and http_request.client.host)
+    with request_admission.admit(tenant):
+        stored = await run_in_threadpool(_analyze_for_tenant, request, tenant, x_priority)
+    # Reuse the body serialized once at save time.
+    return json_response(http_request, body=stored.body, etag=stored.etag)
+
+
+def _analyze_for_tenant(request: AnalyzeRequest, tenant: str, lane: Optional[str]) -> StoredPack:
+    # Runs in the worker thread, so the tenant context is set here.
+    with tenant_context(tenant, lane):
+        return pack_store.save(_analyze(request))
+
+
+def _analyze(request: AnalyzeRequest) -> AnalyzeResponse:
     try:
-        # 1. Scrape website
-        website_text = fetch_website_text(request.url, fallback_text=request.fallbackText)
+        # 1. Scrape website (text + structured data: JSON-LD, OpenGraph, colors)
+        scraped = scrape_website(request.url, fallback_text=request.fallbackText)
+        
+        # 2. Resolve "auto" to a brand type locally when confident
+        tone_preset = resolve_tone_preset(scraped.text, request.tonePreset)
         
-        # 2. Generate brand profile
-        brand_profile = generate_brand_profile(website_text, request.tonePreset)
+        # 3. Generate brand profile (LLM only fills what structured data lacks)
+        brand_profile = generate_brand_profile(scraped.text, tone_preset, known=scraped.structured)
         
-        # 3. Generate posts
-        posts = generate_posts(brand_profile, request.tonePreset)
+        # 4. Generate posts
+        posts = generate_posts(brand_profile, tone_preset)
         
-        # 4. Generate images for each post (NEW!)
+        # 5. Generate images for each post (NEW!)
         from app.services.image_gen import generate_post_image
         
         for post in posts:
@@ -31,7 +68,8 @@ async def analyze_website(request: AnalyzeRequest):
                     post_caption=post.caption,
                     platform=post.platform,
                     tone=post.tone,
-                    hashtags=post.hashtags
+                    hashtags=post.hashtags,
+                    brand_type=tone_preset
                 )
                 post.image_url = image_url
                 print(f"✅ Generated image for {post.platform} post")
@@ -44,5 +82,7 @@ async def analyze_website(request: AnalyzeRequest):
             posts=posts
         )
         
+    except SchedulerRejected:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,104 @@
+from typing import AsyncIterator, Iterator, Optional
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+from app.responses import render_json
+from app.schemas import CampaignRequest
+from app.services.brand_profile import generate_brand_profile
+from app.services.campaign import generate_campaign
+from app.services.scheduler import BATCH, SchedulerRejected, client_tenant, request_admission, tenant_context
+from app.services.scraper import scrape_website
+from app.services.tone_classifier import resolve_tone_preset
+
+router = APIRouter()
+
+
+class _AdmittedStream(StreamingResponse):
+    """
+    Streaming response that holds an admission slot until it is done.
+
+    The slot is released in `__call__`, not in the body generator: a body
+    that never starts (client gone before the response starts) would never
+    run the generator's `finally`.
+    """
+
+    def __init__(self, content: AsyncIterator[bytes], tenant: str, **kwargs):
+        super().__init__(content, **kwargs)
+        self.tenant = tenant
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            request_admission.leave(self.tenant)
+
+
+@router.post("/campaign")
+async def create_campaign(
+    request: CampaignRequest,
+    http_request: Request,
+    x_api_key: Optional[str] = Header(default=None),
+):
+    """
+    Generate a content calendar (up to 300 posts) for one brand, streamed as
+    NDJSON while chunks complete:
+
+        {"type": "brand_profile", "brand_profile": {...}}
+        {"type": "posts", "posts": [...]}          (one line per chunk)
+        {"type": "done", "requested": N, "generated": M}
+
+    Always runs on the batch lane (X-Priority is ignored): a 300-post
+    campaign must never compete with interactive /analyze calls. Admission is
+    checked before any threadpool work starts (429 over the tenant's cap);
+    if the queue rejects work mid-stream, an {"type": "error"} line ends it.
+    """
+
+    tenant = client_tenant(x_api_key, http_request.client and http_request.client.host)
+
+    def stream() -> Iterator[bytes]:
+        # Context is set per step: a sync generator may resume on a
+        # different threadpool thread between yields.
+        try:
+            with tenant_context(tenant, BATCH):
+                scraped = scrape_website(request.url, fallback_text=request.fallbackText)
+                tone_preset = resolve_tone_preset(scraped.text, request.tonePreset)
+                brand_profile = generate_brand_profile(scraped.text, tone_preset, known=scraped.structured)
+        except SchedulerRejected as e:
+            yield render_json({"type": "error", "detail": str(e)}) + b"\n"
+            return
+        yield render_json({"type": "brand_profile", "brand_profile": brand_profile.model_dump(mode="json")}) + b"\n"
+
+        generated = 0
+        for posts in generate_campaign(
+            brand_profile,
+            tone_preset,
+            request.counts,
+            request.start_date,
+            request.end_date,
+            tenant=tenant,
+            lane=BATCH,
+        ):
+            generated += len(posts)
+            yield render_json({"type": "posts", "posts": [post.model_dump(mode="json") for post in posts]}) + b"\n"
+
+        yield render_json({
+            "type": "done",
+            "requested": sum(request.counts.values()),
+            "generated": generated,
+        }) + b"\n"
+
+    request_admission.enter(tenant)
+
+    async def guarded() -> AsyncIterator[bytes]:
+        lines = stream()
+        try:
+            async for line in iterate_in_threadpool(lines):
+                yield line
+        finally:
+            try:
+                # Stops the campaign from starting further chunks.
+                lines.close()
+            except ValueError:
+                pass  # still running in a worker thread; it stops at its next yield
+
+    return _AdmittedStream(guarded(), tenant, media_type="application/x-ndjson")
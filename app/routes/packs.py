@@ -0,0 +1,55 @@
+import hashlib
+from typing import List, Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from app.responses import json_response
+from app.schemas import AnalyzeResponse
+from app.services.pack_store import pack_store
+from app.services.scheduler import client_tenant, tenant_context
+
+router = APIRouter()
+
+# Async on purpose: reads are in-memory lookups, so they never wait for a
+# threadpool thread behind queued /analyze work.
+
+
+@router.get("/packs", response_model=List[AnalyzeResponse])
+async def list_packs(
+    request: Request,
+    limit: int = Query(default=50, ge=1, le=500),
+    x_api_key: Optional[str] = Header(default=None),
+):
+    """
+    History of generated content packs for this tenant, newest first.
+
+    Requires X-API-Key: keyless tenants are per client address, which
+    users behind one NAT or proxy share, so their history isn't served.
+    Built from each pack's pre-serialized body, so large histories cost a
+    byte join rather than a re-serialization. Supports If-None-Match.
+    """
+    if not x_api_key:
+        raise HTTPException(status_code=401, detail="X-API-Key required for pack history")
+    with tenant_context(client_tenant(x_api_key, request.client and request.client.host)):
+        packs = pack_store.history(limit=limit)
+
+    body = b"[" + b",".join(stored.body for stored in packs) + b"]"
+    digest = hashlib.sha256("".join(stored.etag for stored in packs).encode("utf-8"))
+    etag = '"' + digest.hexdigest()[:32] + '"'
+    return json_response(request, body=body, etag=etag)
+
+
+@router.get("/packs/{pack_id}", response_model=AnalyzeResponse)
+async def get_pack(
+    pack_id: str,
+    request: Request,
+    x_api_key: Optional[str] = Header(default=None),
+):
+    """
+    Fetch a previously generated pack. Repeat fetches get a 304.
+
+    Keyless callers can read the packs generated from their own address.
+    """
+    with tenant_context(client_tenant(x_api_key, request.client and request.client.host)):
+        stored = pack_store.get(pack_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Pack not found")
+    return json_response(request, body=stored.body, etag=stored.etag)
@@ -1,9 +1,9 @@
-from typing import List, Literal, Optional
-from pydantic import BaseModel
+from datetime import date
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
 
-
-from typing import List, Literal, Optional
-from pydantic import BaseModel
+Platform = Literal["Instagram", "LinkedIn", "X"]
+MAX_CAMPAIGN_POSTS = 300
 
 class AnalyzeRequest(BaseModel):
     url: str
@@ -22,14 +22,36 @@ class BrandProfile(BaseModel):
 
 
 class GeneratedPost(BaseModel):
-    platform: Literal["Instagram", "LinkedIn", "X"]
+    platform: Platform
     caption: str
     hashtags: List[str]
     cta: str
     tone: str
     engagement_score_label: str
     image_url: Optional[str] = None  # NEW FIELD FOR MARKETING IMAGES
+    scheduled_date: Optional[date] = None  # set in campaign mode only
 
 class AnalyzeResponse(BaseModel):
     brand_profile: BrandProfile
     posts: List[GeneratedPost]
+    pack_id: Optional[str] = None  # content hash; fetch again via GET /packs/{pack_id}
+
+
+class CampaignRequest(BaseModel):
+    url: str
+    tonePreset: str = "auto"
+    fallbackText: Optional[str] = None
+    counts: Dict[Platform, int] = Field(..., description="Posts per platform, e.g. {\"Instagram\": 30}")
+    start_date: date
+    end_date: date
+
+    @model_validator(mode="after")
+    def check_campaign(self):
+        if any(n < 0 for n in self.counts.values()):
+            raise ValueError("counts must be non-negative")
+        total = sum(self.counts.values())
+        if not 1 <= total <= MAX_CAMPAIGN_POSTS:
+            raise ValueError(f"total posts must be between 1 and {MAX_CAMPAIGN_POSTS}")
+        if self.end_date < self.start_date:
+            raise ValueError("end_date must not be before start_date")
+        return self
@@ -0,0 +1,218 @@
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from app.schemas import BrandProfile, GeneratedPost
+from app.services.image_gen import generate_post_image
+from app.services.posts import generate_post_batch
+from app.services.scheduler import BATCH, llm_scheduler, tenant_context
+
+# Max posts per LLM call. Small enough to never truncate, large enough to
+# keep the per-call prompt overhead low.
+CHUNK_SIZE = 10
+# Extra rounds to make up for posts dropped as duplicates or failed chunks.
+MAX_TOPUP_ROUNDS = 2
+
+ANGLES = [
+    "brand awareness and origin story",
+    "product or service spotlight",
+    "customer success story or testimonial",
+    "educational tip or how-to",
+    "behind the scenes and team",
+    "limited-time offer or promotion",
+    "community and values",
+    "FAQ or myth busting",
+    "seasonal or event tie-in",
+    "value and results for the audience",
+    "user-generated content and social proof",
+    "comparison or problem/solution",
+]
+
+# Captions this similar (word-shingle Jaccard) are treated as duplicates;
+# somewhat similar captions are duplicates when hashtags also match closely.
+CAPTION_DUP_THRESHOLD = 0.7
+CAPTION_NEAR_THRESHOLD = 0.4
+HASHTAG_DUP_THRESHOLD = 0.8
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def _shingles(text: str, size: int = 3) -> Set[Tuple[str, ...]]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def normalize_hashtags(hashtags: List[str]) -> List[str]:
+    """'#Coffee', 'coffee' and '#coffee ' collapse to one '#Coffee' (first spelling wins)."""
+    seen = set()
+    result = []
+    for tag in hashtags:
+        tag = "#" + tag.strip().lstrip("#").replace(" ", "")
+        if len(tag) > 1 and tag.lower() not in seen:
+            seen.add(tag.lower())
+            result.append(tag)
+    return result
+
+
+class PostDeduper:
+    """Rejects posts whose caption (and hashtags) nearly match an accepted post."""
+
+    def __init__(self):
+        self._accepted: List[Tuple[Set[Tuple[str, ...]], Set[str]]] = []
+
+    def add(self, post: GeneratedPost) -> bool:
+        """Accept `post` unless it is a near-duplicate; returns whether it was accepted."""
+        caption = _shingles(post.caption)
+        tags = {tag.lower() for tag in post.hashtags}
+        for seen_caption, seen_tags in self._accepted:
+            caption_sim = _jaccard(caption, seen_caption)
+            if caption_sim >= CAPTION_DUP_THRESHOLD:
+                return False
+            if caption_sim >= CAPTION_NEAR_THRESHOLD and _jaccard(tags, seen_tags) >= HASHTAG_DUP_THRESHOLD:
+                return False
+        self._accepted.append((caption, tags))
+        return True
+
+
+def _schedule(start: date, end: date, n: int) -> List[date]:
+    """Spread `n` posts evenly over [start, end]."""
+    days = (end - start).days + 1
+    return [start + timedelta(days=(i * days) // n) for i in range(n)]
+
+
+def _plan_chunks(counts: Dict[str, int]) -> List[Dict[str, int]]:
+    """Split per-platform counts into chunks of at most CHUNK_SIZE mixed posts."""
+    remaining = {platform: n for platform, n in counts.items() if n > 0}
+    chunks = []
+    while remaining:
+        chunk: Dict[str, int] = {}
+        size = 0
+        # Take proportionally from every platform so chunks stay mixed.
+        total = sum(remaining.values())
+        for platform, n in remaining.items():
+            take = max(1, round(CHUNK_SIZE * n / total))
+            take = min(take, n, CHUNK_SIZE - size)
+            if take > 0:
+                chunk[platform] = take
+                size += take
+        for platform, take in chunk.items():
+            remaining[platform] -= take
+            if not remaining[platform]:
+                del remaining[platform]
+        chunks.append(chunk)
+    return chunks
+
+
+def _opening(caption: str, words: int = 8) -> str:
+    return " ".join(caption.split()[:words])
+
+
+def generate_campaign(
+    brand_profile: BrandProfile,
+    tone_preset: str,
+    counts: Dict[str, int],
+    start_date: date,
+    end_date: date,
+    tenant: Optional[str] = None,
+    lane: str = BATCH,
+    max_workers: Optional[int] = None,
+) -> Iterator[List[GeneratedPost]]:
+    """
+    Generate a month-scale content calendar for one brand profile.
+
+    Posts are generated in chunks of CHUNK_SIZE, each from a different
+    content angle, with up to `max_workers` chunks in flight (defaults to
+    the tenant's LLM concurrency). Near-duplicate captions/hashtags across
+    chunks are dropped and topped up. Yields each chunk's accepted posts,
+    with scheduled dates, as soon as it completes.
+    """
+    if max_workers is None:
+        max_workers = min(llm_scheduler.tenant_concurrency, llm_scheduler.max_concurrency)
+
+    slots = {platform: _schedule(start_date, end_date, n) for platform, n in counts.items() if n > 0}
+    missing = {platform: n for platform, n in counts.items() if n > 0}
+    deduper = PostDeduper()
+    openings: List[str] = []
+    angle_index = 0
+
+    def run_chunk(chunk: Dict[str, int], angle: str, avoid: List[str]) -> List[GeneratedPost]:
+        # Each worker thread has its own context; re-attach the tenant.
+        with tenant_context(tenant, lane):
+            return generate_post_batch(brand_profile, tone_preset, chunk, angle, avoid)
+
+    max_workers = max(1, max_workers)
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for round_no in range(1 + MAX_TOPUP_ROUNDS):
+            if not missing:
+                break
+            chunks = _plan_chunks(missing)
+            print(f"Campaign round {round_no + 1}: {sum(missing.values())} posts in {len(chunks)} chunks")
+
+            # Only max_workers chunks are ever submitted, so a closed stream
+            # leaves nothing queued behind the ones already running.
+            pending = {}
+            while chunks or pending:
+                while chunks and len(pending) < max_workers:
+                    chunk = chunks.pop(0)
+                    angle = ANGLES[angle_index % len(ANGLES)]
+                    angle_index += 1
+                    avoid = openings[-20:] if round_no else []
+                    pending[pool.submit(run_chunk, chunk, angle, avoid)] = (chunk, angle)
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk, angle = pending.pop(future)
+                    try:
+                        generated = future.result()
+                    except Exception as e:
+                        print(f"⚠️ Campaign chunk {chunk} failed: {type(e).__name__}: {e}")
+                        continue
+
+                    accepted = []
+                    for post in generated:
+                        if not missing.get(post.platform):
+                            continue
+                        post.hashtags = normalize_hashtags(post.hashtags)
+                        if not deduper.add(post):
+                            continue
+                        index = counts[post.platform] - missing[post.platform]
+                        post.scheduled_date = slots[post.platform][index]
+                        missing[post.platform] -= 1
+                        if not missing[post.platform]:
+                            del missing[post.platform]
+                        try:
+                            post.image_url = generate_post_image(
+                                brand_name=brand_profile.brand_name,
+                                post_caption=post.caption,
+                                platform=post.platform,
+                                tone=post.tone,
+                                hashtags=post.hashtags,
+                                brand_type=tone_preset,
+                                theme=angle,
+                                variant=post.scheduled_date.isoformat(),
+                            )
+                        except Exception as e:
+                            print(f"⚠️ Failed to generate image for {post.platform}: {e}")
+                        openings.append(_opening(post.caption))
+                        accepted.append(post)
+
+                    print(f"✅ Campaign chunk: {len(accepted)}/{len(generated)} posts accepted")
+                    if accepted:
+                        yield accepted
+    finally:
+        # Runs on early close too (client disconnect): don't block on or
+        # start any more chunks.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if missing:
+        print(f"⚠️ Campaign finished short by {sum(missing.values())} posts: {missing}")
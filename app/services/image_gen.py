@@ -3,10 +3,14 @@ import re
 from typing import Optional
 
 
-def generate_post_image(brand_name: str, post_caption: str, platform: str, tone: str, hashtags: list = None) -> Optional[str]:
+def generate_post_image(brand_name: str, post_caption: str, platform: str, tone: str, hashtags: list = None, brand_type: Optional[str] = None, theme: Optional[str] = None, variant: Optional[str] = None) -> Optional[str]:
     """
     Generate BACKGROUND-ONLY marketing image (no text).
     Text will be overlaid cleanly in the frontend.
+    brand_type (startup/cafe/ngo/enterprise) picks the style directly;
+    otherwise it is guessed from the free-form tone.
+    theme (e.g. a campaign angle) is added to the scene, and variant (e.g. the
+    scheduled date) changes the seed, so posts on one platform differ.
     """
     
     platform_specs = {
@@ -23,10 +27,13 @@ def generate_post_image(brand_name: str, post_caption: str, platform: str, tone:
     }
     
     style = "modern professional gradient background"
-    for key in tone_styles:
-        if key in tone.lower():
-            style = tone_styles[key]
-            break
+    if brand_type in tone_styles:
+        style = tone_styles[brand_type]
+    else:
+        for key in tone_styles:
+            if key in tone.lower():
+                style = tone_styles[key]
+                break
     
     specs = platform_specs.get(platform, platform_specs["Instagram"])
     width, height = specs["size"].split("x")
@@ -35,6 +42,7 @@ def generate_post_image(brand_name: str, post_caption: str, platform: str, tone:
     prompt = (
         f"{brand_name} marketing background. "
         f"{style}. "
+        f"{f'Scene: {theme}. ' if theme else ''}"
         f"Premium product photography. "
         f"Clean spacious layout. "
         f"No text, no words, no letters. "
@@ -46,7 +54,7 @@ def generate_post_image(brand_name: str, post_caption: str, platform: str, tone:
     image_url = (
         f"https://image.pollinations.ai/prompt/{encoded_prompt}"
         f"?width={width}&height={height}&model=flux&nologo=true&enhance=true"
-        f"&seed={abs(hash(brand_name + platform)) % 9999}"
+        f"&seed={abs(hash(brand_name + platform + (variant or ''))) % 9999}"
     )
     
     print(f"✅ {platform} background generated")
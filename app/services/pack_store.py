@@ -0,0 +1,72 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+
+from app.responses import make_etag
+from app.schemas import AnalyzeResponse
+from app.services.scheduler import current_tenant, is_anonymous
+
+MAX_PACKS = int(os.getenv("PACK_STORE_MAX_PACKS", "1000"))
+
+
+class StoredPack(NamedTuple):
+    tenant: str
+    pack: AnalyzeResponse
+    body: bytes  # serialized once at save time, reused by every read
+    etag: str
+
+
+class PackStore:
+    """
+    In-memory LRU of generated content packs, keyed by a content hash.
+
+    Packs are serialized once when saved so read endpoints (and their ETags)
+    never re-run serialization, let alone regeneration.
+    """
+
+    def __init__(self, max_packs: int = MAX_PACKS):
+        self.max_packs = max_packs
+        self._packs: "OrderedDict[str, StoredPack]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, pack: AnalyzeResponse, tenant: Optional[str] = None) -> StoredPack:
+        """
+        Assign `pack.pack_id` from its content and store it for later reads.
+
+        Returns the stored entry, so the caller can send its body and ETag
+        instead of serializing the pack again.
+        """
+        tenant = tenant or current_tenant()
+        content = pack.model_dump_json(exclude={"pack_id"}).encode("utf-8")
+        pack.pack_id = hashlib.sha256(tenant.encode("utf-8") + b"\0" + content).hexdigest()[:16]
+        body = pack.model_dump_json().encode("utf-8")
+
+        stored = StoredPack(tenant, pack, body, make_etag(body))
+        with self._lock:
+            self._packs[pack.pack_id] = stored
+            self._packs.move_to_end(pack.pack_id)
+            while len(self._packs) > self.max_packs:
+                self._packs.popitem(last=False)
+        return stored
+
+    def get(self, pack_id: str, tenant: Optional[str] = None) -> Optional[StoredPack]:
+        tenant = tenant or current_tenant()
+        with self._lock:
+            stored = self._packs.get(pack_id)
+        if stored is None or stored.tenant != tenant:
+            return None
+        return stored
+
+    def history(self, limit: int = 50, tenant: Optional[str] = None) -> List[StoredPack]:
+        """Most recent packs for a tenant, newest first. Never lists keyless tenants."""
+        tenant = tenant or current_tenant()
+        if is_anonymous(tenant):
+            return []
+        with self._lock:
+            packs = list(reversed(self._packs.values()))
+        return [stored for stored in packs if stored.tenant == tenant][:limit]
+
+
+pack_store = PackStore()
@@ -1,45 +1,13 @@
 import json
-import os
-from typing import List
-from openai import OpenAI
+from typing import Dict, List
 from app.schemas import BrandProfile, GeneratedPost
 from app.services.analytics import score_post
+from app.services.llm_client import complete
+from app.services.prompts import RenderedPrompt, registry
+from app.services.scheduler import SchedulerRejected
 
-# Groq client (OpenAI-compatible)
-client = OpenAI(
-    api_key=os.getenv("GROQ_API_KEY"),
-    base_url="https://api.groq.com/openai/v1"
-)
-
-def generate_posts(brand_profile: BrandProfile, tone_preset: str) -> List[GeneratedPost]:
-    """
-    Generate platform-specific social media posts using Groq.
-    """
-    
-    print("=== generate_posts called ===")
-    
-    system_prompt = """You are an expert social media strategist.
-Create engaging, platform-specific social media posts from the given brand profile.
-
-Generate EXACTLY 5 posts total:
-- 2 for Instagram (visual, emotional, emojis OK, shorter)
-- 2 for LinkedIn (professional, value-focused, slightly longer)
-- 1 for X/Twitter (punchy, hook-driven, concise)
-
-Each post must have:
-- platform: "Instagram" or "LinkedIn" or "X"
-- caption: engaging text (use brand details, products, audience)
-- hashtags: array of 3-6 relevant, non-spammy hashtags
-- cta: clear call-to-action (vary these: "Learn more", "Shop now", "Join us", "Get started", "Follow us")
-- tone: phrase describing the post tone
-
-Rules:
-- Use specific details from brand_profile (products, services, audience)
-- Make each post unique with different angles (awareness, feature, story, value, offer)
-- Keep hashtags relevant and professional
-- Output ONLY valid JSON array, no extra text"""
-
-    brand_json = {
+def _brand_json(brand_profile: BrandProfile) -> dict:
+    return {
         "brand_name": brand_profile.brand_name,
         "description": brand_profile.description,
         "products_services": brand_profile.products_services,
@@ -48,49 +16,73 @@ Rules:
         "keywords": brand_profile.keywords
     }
 
-    user_prompt = f"""Brand Profile:
-{json.dumps(brand_json, indent=2)}
 
-Tone preset: {tone_preset}
+def _render_prompt(
+    brand_profile: BrandProfile,
+    tone_preset: str,
+    counts: Dict[str, int],
+    instructions: str = "",
+) -> RenderedPrompt:
+    """Fill the shared "posts" template; only the user message varies."""
+    return registry.render(
+        "posts",
+        brand_json=json.dumps(_brand_json(brand_profile), indent=2),
+        tone_preset=tone_preset,
+        instructions=instructions,
+        total=str(sum(counts.values())),
+        plan="\n".join(f"- {n} for {platform}" for platform, n in counts.items() if n),
+    )
+
+
+def _parse_posts(result, tone_preset: str) -> List[GeneratedPost]:
+    # Handle both array and object with "posts" key
+    posts_data = result if isinstance(result, list) else result.get("posts", [])
+    
+    posts = []
+    for post_data in posts_data:
+        post = GeneratedPost(
+            platform=post_data.get("platform", "Instagram"),
+            caption=post_data.get("caption", ""),
+            hashtags=post_data.get("hashtags", [])[:6],
+            cta=post_data.get("cta", "Learn more"),
+            tone=post_data.get("tone", tone_preset),
+            engagement_score_label=score_post(
+                post_data.get("caption", ""),
+                post_data.get("hashtags", [])
+            )
+        )
+        posts.append(post)
+    return posts
 
-Create 5 platform-specific social media posts as a JSON array."""
+
+def generate_posts(brand_profile: BrandProfile, tone_preset: str) -> List[GeneratedPost]:
+    """
+    Generate platform-specific social media posts using Groq.
+    """
+    
+    print("=== generate_posts called ===")
+    
+    prompt = _render_prompt(
+        brand_profile,
+        tone_preset,
+        {"Instagram": 2, "LinkedIn": 2, "X": 1},
+        "Use a different angle for each post (awareness, feature, story, value, offer).\n",
+    )
 
     try:
         print("Calling Groq API for posts...")
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.8,
-            response_format={"type": "json_object"}
-        )
+        content = complete(prompt, 1200, temperature=0.8, json_mode=True)
         
         print("Groq response received for posts")
-        result = json.loads(response.choices[0].message.content)
-        
-        # Handle both array and object with "posts" key
-        posts_data = result if isinstance(result, list) else result.get("posts", [])
+        result = json.loads(content)
         
-        posts = []
-        for post_data in posts_data:
-            post = GeneratedPost(
-                platform=post_data.get("platform", "Instagram"),
-                caption=post_data.get("caption", ""),
-                hashtags=post_data.get("hashtags", [])[:6],
-                cta=post_data.get("cta", "Learn more"),
-                tone=post_data.get("tone", tone_preset),
-                engagement_score_label=score_post(
-                    post_data.get("caption", ""),
-                    post_data.get("hashtags", [])
-                )
-            )
-            posts.append(post)
+        posts = _parse_posts(result, tone_preset)
         
         print(f"Generated {len(posts)} posts")
         return posts
         
+    except SchedulerRejected:
+        raise
     except Exception as e:
         print(f"!!! ERROR generating posts: {type(e).__name__}: {e}")
         # Fallback posts
@@ -104,3 +96,25 @@ Create 5 platform-specific social media posts as a JSON array."""
                 engagement_score_label="Medium"
             )
         ]
+
+
+def generate_post_batch(
+    brand_profile: BrandProfile,
+    tone_preset: str,
+    counts: Dict[str, int],
+    angle: str,
+    avoid: List[str] = None,
+) -> List[GeneratedPost]:
+    """
+    Generate one campaign chunk: `counts` posts per platform, all written
+    from the same content angle. `avoid` lists openings already used by
+    earlier chunks. Raises on LLM failure so the caller can retry the chunk.
+    """
+    total = sum(counts.values())
+    instructions = f"Content angle: {angle} (every post takes this angle)\n"
+    if avoid:
+        instructions += "Avoid these openings (already used):\n" + "\n".join(f"- {a}" for a in avoid) + "\n"
+    prompt = _render_prompt(brand_profile, tone_preset, counts, instructions)
+
+    content = complete(prompt, 180 * total, temperature=0.9, max_tokens=300 * total, json_mode=True)
+    return _parse_posts(json.loads(content), tone_preset)
@@ -0,0 +1,216 @@
+import hashlib
+from string import Template
+from typing import Dict, List, NamedTuple
+
+# Optional: exact token counts. Falls back to ~4 chars/token.
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # pragma: no cover - depends on environment
+    _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return max(1, len(text) // 4)
+
+
+# Brand-type guidelines: all four are listed in AUTO_TONE_BLOCK, only the
+# chosen one is spelled out per call when a preset is set.
+TONE_PRESETS = {
+    "startup": {
+        "style": "innovative, energetic, growth-focused, disruptive",
+        "focus": "Focus on innovation, disruption, rapid growth, and future potential. Frame as a tech-forward, ambitious venture.",
+        "keywords_hint": "Include words like: innovation, disrupt, scale, future, tech, growth"
+    },
+    "cafe": {
+        "style": "warm, friendly, community-focused, welcoming",
+        "focus": "Emphasize warmth, community connections, local experience, and cozy atmosphere. Frame as a neighborhood gathering place.",
+        "keywords_hint": "Include words like: community, cozy, local, artisan, fresh, welcoming"
+    },
+    "ngo": {
+        "style": "mission-driven, compassionate, impact-focused, purposeful",
+        "focus": "Highlight social impact, mission, positive change, and humanitarian values. Frame as a force for good.",
+        "keywords_hint": "Include words like: impact, mission, change, community, support, sustainable"
+    },
+    "enterprise": {
+        "style": "professional, authoritative, established, corporate",
+        "focus": "Stress reliability, scale, professional excellence, and industry leadership. Frame as a trusted, established leader.",
+        "keywords_hint": "Include words like: enterprise, solution, reliable, professional, industry, leader"
+    }
+}
+
+
+class RenderedPrompt(NamedTuple):
+    system: str
+    user: str
+    version: str  # stable cache key: changes whenever the static prefix changes
+    static_tokens: int
+    prompt_tokens: int
+
+
+class PromptTemplate:
+    """
+    A prompt compiled once at import time.
+
+    The system prompt is fully static, so every call for the same task shares
+    an identical prefix that provider-side prompt caching can reuse. Anything
+    that varies per call lives in the user template, at the end.
+    """
+
+    def __init__(self, task: str, revision: int, system: str, user: str):
+        self.task = task
+        self.system = system.strip()
+        self.user = Template(user.strip())
+        digest = hashlib.sha256(f"{self.system}\0{user}".encode("utf-8")).hexdigest()[:8]
+        self.version = f"{task}@v{revision}-{digest}"
+        self.static_tokens = count_tokens(self.system)
+
+    def render(self, **variables: str) -> RenderedPrompt:
+        user = self.user.substitute(**variables)
+        prompt_tokens = self.static_tokens + count_tokens(user)
+        print(f"Prompt {self.version}: {prompt_tokens} tokens ({self.static_tokens} static prefix)")
+        return RenderedPrompt(self.system, user, self.version, self.static_tokens, prompt_tokens)
+
+
+def log_usage(prompt: RenderedPrompt, response) -> None:
+    """Print provider-reported prompt tokens (and cache hits, when reported)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details else None
+    cached_note = f", {cached} cached" if cached is not None else ""
+    print(f"Prompt {prompt.version}: provider counted {usage.prompt_tokens} prompt tokens{cached_note}")
+
+
+class PromptRegistry:
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+
+    def register(self, task: str, revision: int, system: str, user: str) -> PromptTemplate:
+        template = PromptTemplate(task, revision, system, user)
+        self._templates[task] = template
+        return template
+
+    def render(self, task: str, **variables: str) -> RenderedPrompt:
+        return self._templates[task].render(**variables)
+
+    def describe(self) -> List[Dict[str, object]]:
+        """Versions and static prefix sizes, for /metrics/prompts."""
+        return [
+            {"task": t.task, "version": t.version, "static_tokens": t.static_tokens}
+            for t in self._templates.values()
+        ]
+
+
+registry = PromptRegistry()
+
+
+_brand_types = "\n".join(
+    f"- {key.upper()}: voice is {guide['style']}. {guide['focus']} {guide['keywords_hint']}"
+    for key, guide in TONE_PRESETS.items()
+)
+
+# The brand-type list only matters when the LLM has to pick one, so it lives
+# here rather than in the shared system prompt: preset calls never pay for it.
+AUTO_TONE_BLOCK = f"""TONE MODE: AUTO-DETECT
+Brand types:
+{_brand_types}
+- Decide which brand type above best fits the content, offerings and language
+- Apply that brand voice naturally throughout the profile
+- tone: short phrase describing the communication style you detected and applied"""
+
+registry.register(
+    "brand_profile",
+    revision=3,
+    system="""
+You are a marketing analyst expert.
+
+Extract a concise BRAND PROFILE from the given website text, interpreted through
+the TONE MODE given at the end of the user message.
+
+Output ONLY valid JSON with exactly the keys listed under KEYS TO RETURN at the
+end of the user message, chosen from:
+- brand_name: string (never use "Unknown Brand" - infer from text)
+- description: string (1-2 sentences in the brand voice)
+- products_services: array of 3-8 short strings (framed in the brand voice)
+- target_audience: array of 3-8 short strings (who they serve)
+- tone: short phrase describing the communication style (use the exact phrase if the TONE MODE gives one)
+- keywords: array of 5-15 short strings (aligned with the brand voice)
+- colors: array of 3-6 color names or hex codes if mentioned (e.g. "#123456" or "navy blue")
+
+Rules:
+- Do NOT return any extra keys, explanations, or comments
+- Never use placeholders like "Unknown Brand" or "not available"
+- If something is unclear, make a reasonable guess from the text
+- If colors aren't mentioned, suggest 2-3 colors that fit the brand voice
+- ALWAYS apply the TONE MODE perspective to your interpretation
+""",
+    user="""
+Website text:
+---
+$website_text
+---
+
+$known_block$tone_block
+
+KEYS TO RETURN: $keys
+Return ONLY valid JSON.
+""",
+)
+
+_posts_system = """
+You are an expert social media strategist.
+Create engaging, platform-specific social media posts from the given brand profile.
+
+Platform styles:
+- Instagram: visual, emotional, emojis OK, shorter
+- LinkedIn: professional, value-focused, slightly longer
+- X: punchy, hook-driven, concise
+
+Each post must have:
+- platform: "Instagram" or "LinkedIn" or "X"
+- caption: engaging text (use brand details, products, audience)
+- hashtags: array of 3-6 relevant, non-spammy hashtags
+- cta: clear call-to-action (vary these: "Learn more", "Shop now", "Join us", "Get started", "Follow us")
+- tone: phrase describing the post tone
+
+Rules:
+- Use specific details from brand_profile (products, services, audience)
+- Make each post unique with its own hook, subject and hashtags
+- Never repeat an opening line, and don't reuse any openings listed under "Avoid"
+- Keep hashtags relevant and professional
+- Output ONLY a valid JSON object: {"posts": [...]}
+"""
+
+registry.register(
+    "posts",
+    revision=1,
+    system=_posts_system,
+    user="""
+Brand Profile:
+$brand_json
+
+Tone preset: $tone_preset
+$instructions
+Create EXACTLY $total posts:
+$plan
+""",
+)
+
+registry.register(
+    "fallback",
+    revision=1,
+    system="""
+You describe companies from their domain name alone, for a marketing tool whose
+website scraper was blocked.
+
+Given a domain name, write a brief 2-3 sentence description of what this
+company/website likely does, their main products/services, and target audience.
+
+Be specific and realistic. Output plain text only, no formatting.
+""",
+    user="Domain: $domain",
+)
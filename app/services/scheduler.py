@@ -0,0 +1,470 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+# Traffic lanes. Interactive requests (/analyze from the UI) are always
+# dispatched before batch work (agency exports, campaigns).
+INTERACTIVE = "interactive"
+BATCH = "batch"
+LANES = (INTERACTIVE, BATCH)
+
+# Seconds between sweeps that forget idle tenants' quota and fairness state.
+PRUNE_INTERVAL = 60.0
+
+# Keyless callers are tenants per client address ("anonymous:<host>"), so
+# browser users don't all share one tenant's quota. DEFAULT_TENANT alone is
+# used only when no address is known (e.g. work outside a request).
+DEFAULT_TENANT = "anonymous"
+
+# Tenant + lane of the request being served. Set once by the route and read
+# by the services, so service signatures don't need to change.
+_current_tenant: ContextVar[str] = ContextVar("current_tenant", default=DEFAULT_TENANT)
+_current_lane: ContextVar[str] = ContextVar("current_lane", default=INTERACTIVE)
+
+
+class SchedulerRejected(Exception):
+    """Work was refused instead of queued; routes turn this into a 429."""
+
+    def __init__(self, message: str, retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueTimeout(SchedulerRejected):
+    """A ticket waited longer than its lane's queue timeout."""
+
+
+class TenantBusy(SchedulerRejected):
+    """Too many requests already in flight for this tenant (or overall)."""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _parse_weights(raw: str) -> Dict[str, float]:
+    """Parse "key1:3,key2:0.5" into a tenant -> weight mapping."""
+    weights = {}
+    for item in raw.split(","):
+        if ":" not in item:
+            continue
+        tenant, weight = item.rsplit(":", 1)
+        try:
+            weights[tenant.strip()] = max(float(weight), 0.01)
+        except ValueError:
+            continue
+    return weights
+
+
+def normalize_lane(lane: Optional[str]) -> str:
+    lane = (lane or INTERACTIVE).lower()
+    return lane if lane in LANES else INTERACTIVE
+
+
+def client_tenant(api_key: Optional[str], client_host: Optional[str]) -> str:
+    """
+    Tenant for a request: its X-API-Key, or its client address when keyless.
+
+    A key in the anonymous namespace is ignored, so a caller can't take over
+    another client's identity (and its packs) by sending it as a key.
+    """
+    if api_key and not is_anonymous(api_key):
+        return api_key
+    return f"{DEFAULT_TENANT}:{client_host}" if client_host else DEFAULT_TENANT
+
+
+def is_anonymous(tenant: str) -> bool:
+    return tenant == DEFAULT_TENANT or tenant.startswith(DEFAULT_TENANT + ":")
+
+
+@contextmanager
+def tenant_context(tenant: Optional[str], lane: Optional[str] = INTERACTIVE) -> Iterator[None]:
+    """Attribute all scheduled work inside the block to `tenant` on `lane`."""
+    tenant_token = _current_tenant.set(tenant or DEFAULT_TENANT)
+    lane_token = _current_lane.set(normalize_lane(lane))
+    try:
+        yield
+    finally:
+        _current_tenant.reset(tenant_token)
+        _current_lane.reset(lane_token)
+
+
+def current_tenant() -> str:
+    return _current_tenant.get()
+
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+
+class _TokenBucket:
+    """Per-tenant token quota, refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: int):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, tokens: int) -> float:
+        # Requests larger than the whole bucket only need a full bucket,
+        # otherwise they could never run.
+        needed = min(float(tokens), self.capacity) - self.level
+        return 0.0 if needed <= 0 else needed / self.rate
+
+
+class _Ticket:
+    __slots__ = ("tenant", "lane", "tokens", "finish_tag", "enqueued_at", "seq")
+
+    def __init__(self, tenant: str, lane: str, tokens: int, finish_tag: float, seq: int):
+        self.tenant = tenant
+        self.lane = lane
+        self.tokens = tokens
+        self.finish_tag = finish_tag
+        self.enqueued_at = time.monotonic()
+        self.seq = seq
+
+
+class Slot:
+    """Handle returned by `FairScheduler.acquire`; reports actual token usage."""
+
+    def __init__(self, scheduler: "FairScheduler", tenant: str, reserved: int):
+        self._scheduler = scheduler
+        self.tenant = tenant
+        self.reserved = reserved
+
+    def record_usage(self, tokens: Optional[int]) -> None:
+        """Correct the up-front estimate once the provider reports real usage."""
+        if tokens is None:
+            return
+        self._scheduler._settle(self.tenant, tokens - self.reserved)
+        self.reserved = tokens
+
+
+class FairScheduler:
+    """
+    Weighted fair queue in front of a shared resource (LLM calls, scrapes).
+
+    - Interactive lane is served strictly before the batch lane.
+    - Within a lane, tenants are served in order of virtual finish time
+      (start-time fair queuing), so a tenant with weight 2 gets twice the
+      share of a tenant with weight 1 and a large batch can't starve others.
+    - Global and per-tenant concurrency limits, plus an optional per-tenant
+      tokens-per-minute quota.
+    - `interactive_reserve` slots are never handed to batch work, so an
+      interactive request never waits behind a full house of batch calls.
+
+    Tenants are whatever the caller sends as X-API-Key; nothing here
+    validates them, and a caller that rotates keys gets a fresh quota per
+    key. Per-tenant limits only mean something behind a proxy that
+    authenticates keys. State for idle tenants is dropped periodically, so
+    unknown keys don't accumulate.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        tenant_concurrency: int,
+        tenant_tokens_per_minute: int = 0,
+        weights: Optional[Dict[str, float]] = None,
+        interactive_reserve: int = 1,
+        queue_timeout: Optional[Dict[str, float]] = None,
+        history: int = 512,
+    ):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.tenant_concurrency = max(1, tenant_concurrency)
+        self.tenant_tokens_per_minute = tenant_tokens_per_minute
+        self.weights = weights or {}
+        self.interactive_reserve = min(max(0, interactive_reserve), self.max_concurrency - 1)
+        # Max seconds a ticket may wait per lane (concurrency or token quota)
+        # before QueueTimeout; None means wait indefinitely.
+        self.queue_timeout = queue_timeout or {}
+
+        self._cond = threading.Condition()
+        self._queues: Dict[str, List[_Ticket]] = {lane: [] for lane in LANES}
+        self._running = 0
+        self._running_by_tenant: Dict[str, int] = {}
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._last_finish: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._seq = 0
+        self.prune_interval = PRUNE_INTERVAL
+        self._next_prune = 0.0
+
+        self._waits: Dict[str, Deque[float]] = {lane: deque(maxlen=history) for lane in LANES}
+        self._completed = {lane: 0 for lane in LANES}
+        self._timed_out = {lane: 0 for lane in LANES}
+
+    def _weight(self, tenant: str) -> float:
+        return self.weights.get(tenant, 1.0)
+
+    def _bucket(self, tenant: str) -> Optional[_TokenBucket]:
+        if self.tenant_tokens_per_minute <= 0:
+            return None
+        bucket = self._buckets.get(tenant)
+        if bucket is None:
+            bucket = self._buckets[tenant] = _TokenBucket(self.tenant_tokens_per_minute)
+        return bucket
+
+    def _pick(self, now: float) -> Tuple[Optional[_Ticket], Optional[float]]:
+        """Return the next dispatchable ticket, or how long to wait for quota."""
+        if self._running >= self.max_concurrency:
+            return None, None
+        retry_in = None
+        for lane in LANES:
+            if lane == BATCH and self._running >= self.max_concurrency - self.interactive_reserve:
+                break
+            best = None
+            for ticket in self._queues[lane]:
+                if self._running_by_tenant.get(ticket.tenant, 0) >= self.tenant_concurrency:
+                    continue
+                bucket = self._bucket(ticket.tenant)
+                if bucket is not None:
+                    bucket.refill(now)
+                    wait = bucket.wait_time(ticket.tokens)
+                    if wait > 0:
+                        retry_in = wait if retry_in is None else min(retry_in, wait)
+                        continue
+                if best is None or (ticket.finish_tag, ticket.seq) < (best.finish_tag, best.seq):
+                    best = ticket
+            if best is not None:
+                return best, None
+        return None, retry_in
+
+    def _prune_idle(self, now: float) -> None:
+        """
+        Forget tenants with nothing queued or running once forgetting them
+        changes nothing: their bucket has refilled and the virtual clock has
+        passed their last finish tag. Caller holds `self._cond`.
+        """
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.prune_interval
+        busy = set(self._running_by_tenant)
+        busy.update(ticket.tenant for queue in self._queues.values() for ticket in queue)
+        if not busy and self._last_finish:
+            # Nothing in flight: a new busy period starts from the latest tag.
+            self._virtual_time = max(self._virtual_time, max(self._last_finish.values()))
+        for tenant in list(self._last_finish):
+            if tenant not in busy and self._last_finish[tenant] <= self._virtual_time:
+                del self._last_finish[tenant]
+        for tenant in list(self._buckets):
+            if tenant in busy:
+                continue
+            bucket = self._buckets[tenant]
+            bucket.refill(now)
+            if bucket.level >= bucket.capacity:
+                del self._buckets[tenant]
+
+    def _settle(self, tenant: str, delta: int) -> None:
+        with self._cond:
+            bucket = self._bucket(tenant)
+            if bucket is not None:
+                bucket.refill(time.monotonic())
+                bucket.level -= delta
+            self._cond.notify_all()
+
+    @contextmanager
+    def acquire(
+        self,
+        est_tokens: int = 0,
+        tenant: Optional[str] = None,
+        lane: Optional[str] = None,
+    ) -> Iterator[Slot]:
+        """
+        Block until this tenant may run one unit of work, then hold the slot
+        for the duration of the `with` block.
+
+        Tenant and lane default to the ones set by `tenant_context`. Raises
+        QueueTimeout if the lane's queue timeout passes before a slot frees up.
+        """
+        tenant = tenant or current_tenant()
+        lane = normalize_lane(lane or current_lane())
+        timeout = self.queue_timeout.get(lane)
+
+        with self._cond:
+            self._prune_idle(time.monotonic())
+            start_tag = max(self._virtual_time, self._last_finish.get(tenant, 0.0))
+            finish_tag = start_tag + max(est_tokens, 1) / self._weight(tenant)
+            self._last_finish[tenant] = finish_tag
+            self._seq += 1
+            ticket = _Ticket(tenant, lane, est_tokens, finish_tag, self._seq)
+            self._queues[lane].append(ticket)
+            deadline = None if timeout is None else ticket.enqueued_at + timeout
+
+            while True:
+                now = time.monotonic()
+                chosen, retry_in = self._pick(now)
+                if chosen is ticket:
+                    break
+                if deadline is not None:
+                    if now >= deadline:
+                        self._queues[lane].remove(ticket)
+                        self._timed_out[lane] += 1
+                        self._cond.notify_all()
+                        raise QueueTimeout(
+                            f"{self.name} queue wait exceeded {timeout:.0f}s for tenant {tenant}",
+                            retry_after=int(retry_in or 5) + 1,
+                        )
+                    retry_in = deadline - now if retry_in is None else min(retry_in, deadline - now)
+                self._cond.wait(timeout=retry_in)
+
+            self._queues[lane].remove(ticket)
+            self._virtual_time = max(self._virtual_time, start_tag)
+            self._running += 1
+            self._running_by_tenant[tenant] = self._running_by_tenant.get(tenant, 0) + 1
+            bucket = self._bucket(tenant)
+            if bucket is not None:
+                bucket.level -= est_tokens
+            self._waits[lane].append(time.monotonic() - ticket.enqueued_at)
+            self._cond.notify_all()
+
+        slot = Slot(self, tenant, est_tokens)
+        try:
+            yield slot
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._running_by_tenant[tenant] -= 1
+                if not self._running_by_tenant[tenant]:
+                    del self._running_by_tenant[tenant]
+                self._completed[lane] += 1
+                self._prune_idle(time.monotonic())
+                self._cond.notify_all()
+
+    def metrics(self) -> Dict[str, object]:
+        """Queue depth, in-flight counts and wait-time percentiles per lane."""
+        with self._cond:
+            lanes = {}
+            for lane in LANES:
+                waits = sorted(self._waits[lane])
+                lanes[lane] = {
+                    "queue_depth": len(self._queues[lane]),
+                    "completed": self._completed[lane],
+                    "timed_out": self._timed_out[lane],
+                    "wait_ms_p50": _percentile(waits, 0.50) * 1000,
+                    "wait_ms_p95": _percentile(waits, 0.95) * 1000,
+                    "wait_ms_max": (waits[-1] if waits else 0.0) * 1000,
+                }
+            return {
+                "name": self.name,
+                "running": self._running,
+                "max_concurrency": self.max_concurrency,
+                "running_by_tenant": dict(self._running_by_tenant),
+                "tracked_tenants": len(set(self._buckets) | set(self._last_finish)),
+                "lanes": lanes,
+            }
+
+
+class RequestAdmission:
+    """
+    Per-tenant cap on requests in flight, checked before a request takes a
+    threadpool thread.
+
+    Queued tickets block a thread while they wait in `FairScheduler.acquire`,
+    so without this a single tenant could occupy every worker thread and
+    other tenants would never reach the fair queue. Over the cap, requests
+    are rejected with TenantBusy (429) instead of queueing first-come,
+    first-served in the threadpool. `max_total` stays below the threadpool
+    size (40 by default) for the same reason.
+    """
+
+    def __init__(self, max_per_tenant: int, max_total: int):
+        self.max_per_tenant = max(1, max_per_tenant)
+        self.max_total = max(1, max_total)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, int] = {}
+        self._total = 0
+        self._rejected = 0
+
+    def enter(self, tenant: Optional[str]) -> str:
+        tenant = tenant or DEFAULT_TENANT
+        with self._lock:
+            if self._in_flight.get(tenant, 0) >= self.max_per_tenant:
+                self._rejected += 1
+                raise TenantBusy(f"Too many concurrent requests for tenant {tenant}")
+            if self._total >= self.max_total:
+                self._rejected += 1
+                raise TenantBusy("Server is at capacity")
+            self._in_flight[tenant] = self._in_flight.get(tenant, 0) + 1
+            self._total += 1
+        return tenant
+
+    def leave(self, tenant: str) -> None:
+        with self._lock:
+            self._in_flight[tenant] -= 1
+            if not self._in_flight[tenant]:
+                del self._in_flight[tenant]
+            self._total -= 1
+
+    @contextmanager
+    def admit(self, tenant: Optional[str]) -> Iterator[None]:
+        tenant = self.enter(tenant)
+        try:
+            yield
+        finally:
+            self.leave(tenant)
+
+    def metrics(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "in_flight": self._total,
+                "max_total": self.max_total,
+                "max_per_tenant": self.max_per_tenant,
+                "in_flight_by_tenant": dict(self._in_flight),
+                "rejected": self._rejected,
+            }
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+_weights = _parse_weights(os.getenv("TENANT_WEIGHTS", ""))
+
+# Shared Groq quota: every LLM call in the app goes through this queue.
+llm_scheduler = FairScheduler(
+    name="llm",
+    max_concurrency=_env_int("LLM_MAX_CONCURRENCY", 4),
+    tenant_concurrency=_env_int("LLM_TENANT_CONCURRENCY", 2),
+    tenant_tokens_per_minute=_env_int("LLM_TENANT_TOKENS_PER_MINUTE", 60000),
+    weights=_weights,
+    queue_timeout={
+        INTERACTIVE: _env_int("LLM_QUEUE_TIMEOUT_INTERACTIVE", 60),
+        BATCH: _env_int("LLM_QUEUE_TIMEOUT_BATCH", 600),
+    },
+)
+
+# Outbound website fetches. No token quota, only concurrency.
+scrape_scheduler = FairScheduler(
+    name="scrape",
+    max_concurrency=_env_int("SCRAPE_MAX_CONCURRENCY", 8),
+    tenant_concurrency=_env_int("SCRAPE_TENANT_CONCURRENCY", 4),
+    weights=_weights,
+    queue_timeout={
+        INTERACTIVE: _env_int("SCRAPE_QUEUE_TIMEOUT", 30),
+        BATCH: _env_int("SCRAPE_QUEUE_TIMEOUT", 30),
+    },
+)
+
+# Admission in front of the threadpool for /analyze and /campaign.
+request_admission = RequestAdmission(
+    max_per_tenant=_env_int("TENANT_MAX_INFLIGHT_REQUESTS", 6),
+    max_total=_env_int("MAX_INFLIGHT_REQUESTS", 32),
+)
@@ -1,15 +1,12 @@
 import requests
 from bs4 import BeautifulSoup
-from typing import Optional
+from typing import Any, Dict, List, NamedTuple, Optional
+import json
+import re
 import time
-import os
-from openai import OpenAI
-
-# Groq client for fallback generation
-groq_client = OpenAI(
-    api_key=os.getenv("GROQ_API_KEY"),
-    base_url="https://api.groq.com/openai/v1"
-)
+from app.services.llm_client import complete
+from app.services.prompts import registry
+from app.services.scheduler import SchedulerRejected, scrape_scheduler
 
 def generate_fallback_from_url(url: str) -> str:
     """Use LLM to intelligently guess website content from URL when scraping fails"""
@@ -19,31 +16,40 @@ def generate_fallback_from_url(url: str) -> str:
     except:
         domain = url
     
-    prompt = f"""Based on the domain name '{domain}', generate a brief 2-3 sentence description of what this company/website likely does, their main products/services, and target audience.
-
-Be specific and realistic. Output plain text only, no formatting."""
+    prompt = registry.render("fallback", domain=domain)
     
     try:
         print(f"🤖 Generating AI fallback for {domain}...")
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=150
-        )
-        generated = response.choices[0].message.content.strip()
+        generated = complete(prompt, 150, temperature=0.7, max_tokens=150).strip()
         print(f"✓ Generated fallback: {generated[:100]}...")
         return generated
+    except SchedulerRejected:
+        raise
     except Exception as e:
         print(f"Fallback generation failed: {e}")
         return f"A business website at {domain} offering products and services to customers."
 
 
+class ScrapeResult(NamedTuple):
+    text: str
+    # Partial BrandProfile fields read deterministically from the page
+    # (JSON-LD, OpenGraph, meta tags, theme/CSS colors). May be empty.
+    structured: Dict[str, Any]
+
+
 def fetch_website_text(url: str, fallback_text: Optional[str] = None) -> str:
     """
     Fetch and extract text content from a website URL.
     Falls back to fallback_text, then AI-generated fallback if scraping fails.
     """
+    return scrape_website(url, fallback_text).text
+
+
+def scrape_website(url: str, fallback_text: Optional[str] = None) -> ScrapeResult:
+    """
+    Like fetch_website_text, but also returns the structured profile fields
+    found on the page (kept even if the page text itself is too thin).
+    """
     
     print(f"\n=== Scraping {url} ===")
     
@@ -59,17 +65,19 @@ def fetch_website_text(url: str, fallback_text: Optional[str] = None) -> str:
     
     max_retries = 2
     timeout = 8
+    structured: Dict[str, Any] = {}
     
     for attempt in range(max_retries):
         try:
             print(f"Attempt {attempt + 1}/{max_retries}")
             
-            response = requests.get(
-                url, 
-                headers=headers, 
-                timeout=timeout,
-                allow_redirects=True
-            )
+            with scrape_scheduler.acquire():
+                response = requests.get(
+                    url, 
+                    headers=headers, 
+                    timeout=timeout,
+                    allow_redirects=True
+                )
             
             # Check status
             if response.status_code != 200:
@@ -89,6 +97,16 @@ def fetch_website_text(url: str, fallback_text: Optional[str] = None) -> str:
             # Parse HTML
             soup = BeautifulSoup(response.content, 'html.parser')
             
+            # Structured data lives in <script>/<style>, so read it first.
+            # It is optional: broken markup must not cost us the page text.
+            try:
+                structured = extract_structured_profile(soup)
+            except Exception as e:
+                print(f"⚠️ Structured data skipped: {type(e).__name__}: {e}")
+                structured = {}
+            if structured:
+                print(f"✓ Structured data: {sorted(structured)}")
+            
             # Remove script and style elements
             for script in soup(["script", "style", "nav", "footer", "header"]):
                 script.decompose()
@@ -133,8 +151,11 @@ def fetch_website_text(url: str, fallback_text: Optional[str] = None) -> str:
             
             print(f"✓ Successfully scraped {len(full_text)} characters")
             print(f"Preview: {full_text[:150]}...")
-            return full_text
+            return ScrapeResult(full_text, structured)
             
+        except SchedulerRejected:
+            raise
+                
         except requests.exceptions.Timeout:
             print(f"Timeout on attempt {attempt + 1}")
             if attempt < max_retries - 1:
@@ -155,9 +176,156 @@ def fetch_website_text(url: str, fallback_text: Optional[str] = None) -> str:
     
     if fallback_text:
         print(f"✓ Using user-provided fallback ({len(fallback_text)} chars)")
-        return fallback_text
+        return ScrapeResult(fallback_text, structured)
     else:
         # Generate intelligent fallback using AI
         print("🤖 No fallback provided, generating AI-based content...")
         ai_fallback = generate_fallback_from_url(url)
-        return ai_fallback
+        return ScrapeResult(ai_fallback, structured)
+
+
+ORGANIZATION_TYPES = {
+    "Organization", "Corporation", "LocalBusiness", "NGO", "Brand", "Store", "OnlineStore",
+    "Restaurant", "CafeOrCoffeeShop", "FoodEstablishment", "EducationalOrganization",
+    "NonprofitOrganization", "ProfessionalService",
+}
+# Too generic to identify the site owner when a more specific type is present.
+GENERIC_ORGANIZATION_TYPES = {"Organization", "Brand"}
+OFFERING_TYPES = {"Product", "Service", "SoftwareApplication", "MenuItem", "Course"}
+
+_HEX_RE = re.compile(r"^#(?:[0-9a-fA-F]{3,4}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})$")
+_CSS_BRAND_COLOR_RE = re.compile(
+    r"--[\w-]*(?:brand|primary|secondary|accent|theme|main)[\w-]*\s*:\s*(#[0-9a-fA-F]{3,8})\b"
+)
+
+
+def _normalize_hex(value: str) -> Optional[str]:
+    """'#abc', '#AABBCCDD' -> '#AABBCC'; anything else -> None."""
+    value = (value or "").strip()
+    if not _HEX_RE.match(value):
+        return None
+    digits = value[1:]
+    if len(digits) in (3, 4):
+        digits = "".join(c * 2 for c in digits[:3])
+    return "#" + digits[:6].upper()
+
+
+def _types(node: Dict[str, Any]) -> set:
+    # Malformed markup can put dicts or numbers in @type; only names count.
+    value = node.get("@type", [])
+    values = value if isinstance(value, list) else [value]
+    return {v for v in values if isinstance(v, str)}
+
+
+def _walk_json_ld(value: Any) -> List[Dict[str, Any]]:
+    """Flatten JSON-LD (lists, @graph, nested nodes) into a list of typed nodes."""
+    nodes = []
+    if isinstance(value, list):
+        for item in value:
+            nodes.extend(_walk_json_ld(item))
+    elif isinstance(value, dict):
+        if "@type" in value:
+            nodes.append(value)
+        for child in value.values():
+            if isinstance(child, (list, dict)):
+                nodes.extend(_walk_json_ld(child))
+    return nodes
+
+
+def _top_level_nodes(value: Any) -> List[Dict[str, Any]]:
+    """Typed nodes at the root of a JSON-LD block or in its @graph, not nested ones."""
+    nodes = []
+    if isinstance(value, list):
+        for item in value:
+            nodes.extend(_top_level_nodes(item))
+    elif isinstance(value, dict):
+        if "@graph" in value:
+            nodes.extend(_top_level_nodes(value["@graph"]))
+        if "@type" in value:
+            nodes.append(value)
+    return nodes
+
+
+def _text(value: Any) -> Optional[str]:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("@value")
+    if isinstance(value, str) and value.strip():
+        return " ".join(value.split())
+    return None
+
+
+def _unique(items: List[str], limit: int) -> List[str]:
+    seen = set()
+    result = []
+    for item in items:
+        if item and item.lower() not in seen:
+            seen.add(item.lower())
+            result.append(item)
+    return result[:limit]
+
+
+def extract_structured_profile(soup: BeautifulSoup) -> Dict[str, Any]:
+    """
+    Read brand facts the page states explicitly: JSON-LD Organization/Product
+    blocks, OpenGraph and meta tags, theme-color and CSS brand color variables.
+
+    Returns only the BrandProfile fields that were found.
+    """
+    nodes = []
+    top_level = []
+    for script in soup.find_all("script", attrs={"type": "application/ld+json"}):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        nodes.extend(_walk_json_ld(data))
+        top_level.extend(_top_level_nodes(data))
+
+    def meta(*keys: str) -> Optional[str]:
+        for key in keys:
+            tag = soup.find("meta", attrs={"property": key}) or soup.find("meta", attrs={"name": key})
+            if tag and tag.get("content", "").strip():
+                return " ".join(tag["content"].split())
+        return None
+
+    # Nested organizations are usually someone else (a product's seller or
+    # brand, an article's publisher), so the site owner comes from the top
+    # level, most specific type first (a CafeOrCoffeeShop over a bare Organization).
+    organizations = sorted(
+        (n for n in top_level if _types(n) & ORGANIZATION_TYPES),
+        key=lambda n: not (_types(n) & ORGANIZATION_TYPES) - GENERIC_ORGANIZATION_TYPES,
+    )
+    websites = [n for n in nodes if "WebSite" in _types(n)]
+    offerings = [_text(n.get("name")) for n in nodes if _types(n) & OFFERING_TYPES]
+    audiences = [
+        _text(n.get("audienceType")) or _text(n.get("name"))
+        for n in nodes if _types(n) & {"Audience", "BusinessAudience", "PeopleAudience"}
+    ]
+    keywords: List[str] = []
+    for node in organizations + websites:
+        raw = node.get("keywords")
+        if isinstance(raw, str):
+            keywords.extend(k.strip() for k in raw.split(","))
+        elif isinstance(raw, list):
+            keywords.extend(k for k in raw if isinstance(k, str))
+    meta_keywords = meta("keywords")
+    if meta_keywords:
+        keywords.extend(k.strip() for k in meta_keywords.split(","))
+
+    colors = [_normalize_hex(meta("theme-color", "msapplication-TileColor") or "")]
+    for style in soup.find_all("style"):
+        colors.extend(_normalize_hex(m) for m in _CSS_BRAND_COLOR_RE.findall(style.string or ""))
+
+    org = organizations[0] if organizations else {}
+    profile = {
+        "brand_name": _text(org.get("name")) or meta("og:site_name", "application-name")
+        or (_text(websites[0].get("name")) if websites else None),
+        "description": _text(org.get("description")) or meta("og:description", "description"),
+        "products_services": _unique([o for o in offerings if o], 8),
+        "target_audience": _unique([a for a in audiences if a], 8),
+        "keywords": _unique([k for k in keywords if k], 15),
+        "colors": _unique([c for c in colors if c], 6),
+    }
+    return {key: value for key, value in profile.items() if value}
@@ -0,0 +1,130 @@
+import json
+import math
+import os
+import re
+import zlib
+from typing import Dict, List, NamedTuple, Optional
+
+ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "tone_classifier.json")
+
+# Below this confidence, "auto" stays auto and the LLM decides the brand type.
+MIN_CONFIDENCE = float(os.getenv("TONE_CLASSIFIER_MIN_CONFIDENCE", "0.6"))
+
+# Texts shorter than this (canned scrape fallbacks, one-line user input)
+# stay "auto": there is too little to go on, and a wrong preset would lock
+# the tone for the whole pack.
+MIN_WORDS = 60
+
+# Scraped text leads with title, meta description and headings, which carry
+# most of the signal; the cap keeps classification well under a millisecond.
+MAX_CHARS = 2000
+
+_WORD_RE = re.compile(r"[a-z0-9$%]+")
+
+
+def featurize(text: str, n_features: int) -> List[int]:
+    """Hashed word unigrams + bigrams (deduplicated feature indices)."""
+    words = _WORD_RE.findall(text[:MAX_CHARS].lower())
+    mask = n_features - 1
+    features = {zlib.crc32(w.encode("utf-8")) & mask for w in words}
+    features.update(
+        zlib.crc32(f"{a} {b}".encode("utf-8")) & mask for a, b in zip(words, words[1:])
+    )
+    return list(features)
+
+
+class Prediction(NamedTuple):
+    label: str
+    confidence: float
+
+
+class ToneClassifier:
+    """
+    Linear (multinomial logistic regression) brand-type classifier over hashed
+    n-gram features. Trained offline by scripts/train_tone_classifier.py.
+    """
+
+    def __init__(
+        self,
+        labels: List[str],
+        n_features: int,
+        bias: List[float],
+        weights: Dict[int, List[float]],
+        temperature: float = 1.0,
+    ):
+        self.labels = labels
+        self.n_features = n_features
+        self.bias = bias
+        self.weights = weights
+        # Fitted on cross-validated pages so confidences track accuracy.
+        self.temperature = temperature
+
+    @classmethod
+    def load(cls, path: str = ARTIFACT_PATH) -> "ToneClassifier":
+        with open(path) as f:
+            artifact = json.load(f)
+        return cls(
+            labels=artifact["labels"],
+            n_features=artifact["n_features"],
+            bias=artifact["bias"],
+            weights={int(k): v for k, v in artifact["weights"].items()},
+            temperature=artifact.get("temperature", 1.0),
+        )
+
+    def predict(self, text: str) -> Prediction:
+        features = featurize(text, self.n_features)
+        # Binary features, L2-normalized so long pages aren't overconfident.
+        scale = 1.0 / math.sqrt(len(features)) if features else 0.0
+        scores = list(self.bias)
+        for index in features:
+            row = self.weights.get(index)
+            if row is not None:
+                for k, w in enumerate(row):
+                    scores[k] += w * scale
+
+        top = max(scores)
+        exps = [math.exp((s - top) / self.temperature) for s in scores]
+        best = scores.index(top)
+        return Prediction(self.labels[best], exps[best] / sum(exps))
+
+    def predict_batch(self, texts: List[str]) -> List[Prediction]:
+        return [self.predict(text) for text in texts]
+
+
+_classifier: Optional[ToneClassifier] = None
+
+
+def get_classifier() -> Optional[ToneClassifier]:
+    """Load the shipped artifact once; None if it is missing or unreadable."""
+    global _classifier
+    if _classifier is None:
+        try:
+            _classifier = ToneClassifier.load()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Tone classifier unavailable: {e}")
+            return None
+    return _classifier
+
+
+def resolve_tone_preset(website_text: str, tone_preset: Optional[str]) -> str:
+    """
+    Turn "auto" into a concrete preset (startup/cafe/ngo/enterprise) when the
+    local classifier is confident, so the shorter preset prompt is used and
+    image style selection gets an exact brand type. Other presets pass through,
+    and texts under MIN_WORDS always stay "auto".
+    """
+    tone_key = (tone_preset or "auto").lower()
+    if tone_key != "auto":
+        return tone_key
+    if len((website_text or "").split()) < MIN_WORDS:
+        return tone_key
+
+    classifier = get_classifier()
+    if classifier is None:
+        return tone_key
+
+    prediction = classifier.predict(website_text)
+    print(f"Tone classifier: {prediction.label} ({prediction.confidence:.2f})")
+    if prediction.confidence < MIN_CONFIDENCE:
+        return tone_key
+    return prediction.label
@@ -0,0 +1,88 @@
+"""
+Serialization and compression benchmarks for content-pack responses.
+
+Run from the repo root:
+    python -m benchmarks.bench_responses [num_packs]
+"""
+import gzip
+import json
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from app.responses import BROTLI_QUALITY, GZIP_LEVEL, brotli, orjson, render_json
+from app.schemas import AnalyzeResponse, BrandProfile, GeneratedPost
+
+
+def make_pack(i: int) -> AnalyzeResponse:
+    profile = BrandProfile(
+        brand_name=f"Brand {i}",
+        description="An artisan coffee roaster serving the neighbourhood since 2012. " * 2,
+        products_services=["Espresso", "Pour-over", "Beans subscription", "Pastries", "Catering"],
+        target_audience=["Remote workers", "Students", "Local families", "Coffee enthusiasts"],
+        tone="warm, friendly, community-focused, welcoming",
+        keywords=["community", "cozy", "local", "artisan", "fresh", "welcoming", "coffee"],
+        colors=["#6F4E37", "#F5F5DC", "#2E8B57"],
+    )
+    posts = [
+        GeneratedPost(
+            platform=platform,
+            caption=f"Post {j} for brand {i}: start your morning with our single-origin pour-over ☕ "
+                    "and a fresh croissant. Come say hi to the team!",
+            hashtags=["#coffee", "#local", "#artisan", "#morning", "#community"],
+            cta="Learn more",
+            tone="warm",
+            engagement_score_label="Medium",
+            image_url=f"https://image.pollinations.ai/prompt/brand%20{i}%20{j}?width=1080&height=1080",
+        )
+        for j, platform in enumerate(["Instagram", "Instagram", "LinkedIn", "LinkedIn", "X"])
+    ]
+    return AnalyzeResponse(brand_profile=profile, posts=posts, pack_id=f"{i:016x}")
+
+
+def timeit(fn, repeat: int = 20) -> float:
+    """Best-of-`repeat` wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(num_packs: int = 300) -> None:
+    packs = [make_pack(i) for i in range(num_packs)]
+    bodies = [render_json(pack) for pack in packs]
+    history = b"[" + b",".join(bodies) + b"]"
+
+    print(f"== Serialization: {num_packs} packs ({len(history) / 1024:.0f} KiB) ==")
+    results = {
+        "fastapi default (jsonable_encoder + json.dumps)":
+            lambda: json.dumps(jsonable_encoder(packs)).encode("utf-8"),
+        "model_dump_json per pack (render_json)":
+            lambda: [render_json(pack) for pack in packs],
+        "join pre-serialized bodies (PackStore)":
+            lambda: b"[" + b",".join(bodies) + b"]",
+    }
+    if orjson is not None:
+        results["orjson(model_dump())"] = lambda: orjson.dumps([pack.model_dump() for pack in packs])
+    for name, fn in results.items():
+        print(f"{name:<50} {timeit(fn):8.2f} ms")
+
+    print(f"\n== Compression of history body ({len(history)} bytes) ==")
+    codecs = {
+        f"gzip level {GZIP_LEVEL}": lambda: gzip.compress(history, compresslevel=GZIP_LEVEL, mtime=0),
+        "gzip level 1": lambda: gzip.compress(history, compresslevel=1, mtime=0),
+    }
+    if brotli is not None:
+        codecs[f"brotli quality {BROTLI_QUALITY}"] = lambda: brotli.compress(history, quality=BROTLI_QUALITY)
+    else:
+        print("(brotli not installed, skipping br)")
+    for name, fn in codecs.items():
+        size = len(fn())
+        print(f"{name:<50} {timeit(fn, repeat=5):8.2f} ms  {size:>9} bytes  ({size / len(history):.1%})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
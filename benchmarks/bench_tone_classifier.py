@@ -0,0 +1,56 @@
+"""
+Latency and batch throughput of the local brand-type classifier.
+
+Run from the repo root:
+    python -m benchmarks.bench_tone_classifier [batch_size]
+"""
+import json
+import random
+import sys
+import time
+
+from app.services.tone_classifier import MAX_CHARS, get_classifier
+
+DATA_PATH = "scripts/data/tone_training.jsonl"
+
+
+def make_pages(n: int, rng: random.Random) -> list:
+    """Synthetic scraped pages of roughly MAX_CHARS characters."""
+    with open(DATA_PATH) as f:
+        texts = [json.loads(line)["text"] for line in f if line.strip()]
+    pages = []
+    for _ in range(n):
+        page = ""
+        while len(page) < MAX_CHARS:
+            page += rng.choice(texts) + " "
+        pages.append(page)
+    return pages
+
+
+def main(batch_size: int = 1000) -> None:
+    classifier = get_classifier()
+    if classifier is None:
+        sys.exit("No classifier artifact; run python -m scripts.train_tone_classifier")
+
+    pages = make_pages(batch_size, random.Random(7))
+
+    # Warm up, then time single predictions.
+    classifier.predict_batch(pages[:50])
+    latencies = []
+    for page in pages[:200]:
+        start = time.perf_counter()
+        classifier.predict(page)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    print(f"== Single text ({MAX_CHARS} chars) ==")
+    print(f"p50 {latencies[len(latencies) // 2]:.3f} ms   p95 {latencies[int(len(latencies) * 0.95)]:.3f} ms")
+
+    start = time.perf_counter()
+    classifier.predict_batch(pages)
+    elapsed = time.perf_counter() - start
+    print(f"\n== Batch of {batch_size} ==")
+    print(f"{elapsed * 1000:.1f} ms total   {batch_size / elapsed:,.0f} texts/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
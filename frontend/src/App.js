@@ -1,10 +1,10 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import './App.css';
 import URLInputForm from './components/URLInputForm';
 import BrandProfileCard from './components/BrandProfileCard';
 import PostCard from './components/PostCard';
 import LoadingSpinner from './components/LoadingSpinner';
-import { analyzeWebsite, downloadJSON, downloadCSV } from './services/api';
+import { analyzeWebsite, getPack, downloadJSON, downloadCSV } from './services/api';
 import { FaDownload, FaFilter } from 'react-icons/fa';
 
 function App() {
@@ -13,6 +13,15 @@ function App() {
   const [result, setResult] = useState(null);
   const [filterPlatform, setFilterPlatform] = useState('All');
 
+  // Restore the last pack on reload by id instead of regenerating it.
+  useEffect(() => {
+    const packId = localStorage.getItem('lastPackId');
+    if (!packId) return;
+    getPack(packId)
+      .then(setResult)
+      .catch(() => localStorage.removeItem('lastPackId'));
+  }, []);
+
   const handleSubmit = async (url, tonePreset) => {
     setLoading(true);
     setError(null);
@@ -21,6 +30,9 @@ function App() {
     try {
       const data = await analyzeWebsite(url, tonePreset);
       setResult(data);
+      if (data.pack_id) {
+        localStorage.setItem('lastPackId', data.pack_id);
+      }
     } catch (err) {
       setError(err.message || 'Failed to analyze website. Please try again.');
       console.error(err);
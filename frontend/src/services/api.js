@@ -23,6 +23,13 @@ export const analyzeWebsite = async (url, tonePreset = 'auto') => {
   }
 };
 
+// Repeat fetches revalidate with If-None-Match (browser HTTP cache + ETag),
+// so an unchanged pack costs a 304 instead of a regeneration.
+export const getPack = async (packId) => {
+  const response = await axios.get(`${API_BASE_URL}/packs/${packId}`);
+  return response.data;
+};
+
 export const downloadJSON = (data, filename) => {
   const blob = new Blob([JSON.stringify(data, null, 2)], { type: 'application/json' });
   const url = URL.createObjectURL(blob);
@@ -0,0 +1,233 @@
+"""
+Train the local brand-type classifier and write app/data/tone_classifier.json.
+
+Run from the repo root:
+    python -m scripts.train_tone_classifier [pages.jsonl] [snippets.jsonl]
+
+Training data is one JSON object per line: {"label": "cafe", "text": "..."}.
+`pages` are whole scraped pages (title, meta description, headings and
+paragraphs, as the scraper returns them); `snippets` are single sentences
+used to build extra synthetic pages. Accuracy and calibration are reported
+by cross-validation over the pages only, since that is what the classifier
+sees in production.
+
+Pure Python on purpose: the artifact is a few hundred KB of sparse weights
+and inference needs no numpy/sklearn at runtime.
+"""
+import json
+import math
+import random
+import re
+import sys
+from collections import defaultdict
+
+from app.services.tone_classifier import ARTIFACT_PATH, MAX_CHARS, MIN_CONFIDENCE, featurize
+
+PAGES_PATH = "scripts/data/tone_pages.jsonl"
+SNIPPETS_PATH = "scripts/data/tone_training.jsonl"
+N_FEATURES = 2 ** 14
+EPOCHS = 20
+LEARNING_RATE = 0.5
+L2 = 1e-5
+AUGMENTED_PER_LABEL = 200
+FOLDS = 4
+CALIBRATION_BINS = 5
+SEED = 13
+
+# Text every kind of site has. Mixed into synthetic pages of all labels so
+# the model learns it carries no signal.
+BOILERPLATE = [
+    "We use cookies to improve your experience. Accept all cookies.",
+    "Sign up for our newsletter to get the latest news and updates.",
+    "Follow us on Instagram, Facebook and LinkedIn.",
+    "Contact us with any questions. We would love to hear from you.",
+    "Read our privacy policy and terms of service.",
+    "Copyright 2025. All rights reserved.",
+    "Learn more about our story and the people behind it.",
+    "Frequently asked questions",
+    "Get in touch today.",
+    "Subscribe to stay in the loop.",
+    "Our team is here to help.",
+    "Thank you for visiting our website.",
+]
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def load(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def augment(pages, snippets, rng):
+    """
+    Synthetic scraped pages per label: sentences from that label's pages and
+    snippets, shuffled with shared boilerplate, up to about MAX_CHARS.
+    """
+    sentences = defaultdict(list)
+    for ex in pages:
+        sentences[ex["label"]].extend(s for s in _SENTENCE_RE.split(ex["text"]) if s)
+    for ex in snippets:
+        sentences[ex["label"]].append(ex["text"])
+
+    synthetic = list(pages) + list(snippets)
+    for label, pool in sentences.items():
+        for _ in range(AUGMENTED_PER_LABEL):
+            target = rng.randint(MAX_CHARS // 4, MAX_CHARS)
+            parts, size = [], 0
+            while size < target:
+                part = rng.choice(BOILERPLATE) if rng.random() < 0.2 else rng.choice(pool)
+                parts.append(part)
+                size += len(part) + 1
+            synthetic.append({"label": label, "text": " ".join(parts)})
+    return synthetic
+
+
+def vectorize(text):
+    features = featurize(text, N_FEATURES)
+    scale = 1.0 / math.sqrt(len(features)) if features else 0.0
+    return features, scale
+
+
+def softmax(scores, temperature=1.0):
+    scores = [s / temperature for s in scores]
+    top = max(scores)
+    exps = [math.exp(s - top) for s in scores]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+def train(examples, labels, rng):
+    n = len(labels)
+    weights = defaultdict(lambda: [0.0] * n)
+    bias = [0.0] * n
+    data = [(vectorize(ex["text"]), labels.index(ex["label"])) for ex in examples]
+
+    for epoch in range(EPOCHS):
+        rng.shuffle(data)
+        lr = LEARNING_RATE / (1 + epoch * 0.1)
+        loss = 0.0
+        for (features, scale), y in data:
+            scores = list(bias)
+            for i in features:
+                row = weights[i]
+                for k in range(n):
+                    scores[k] += row[k] * scale
+            probs = softmax(scores)
+            loss -= math.log(max(probs[y], 1e-12))
+            for k in range(n):
+                grad = probs[k] - (1.0 if k == y else 0.0)
+                bias[k] -= lr * grad
+                for i in features:
+                    weights[i][k] -= lr * (grad * scale + L2 * weights[i][k])
+        print(f"epoch {epoch + 1:2d}  loss {loss / len(data):.4f}")
+    return bias, weights
+
+
+def scores_for(bias, weights, text):
+    features, scale = vectorize(text)
+    scores = list(bias)
+    for i in features:
+        row = weights.get(i)
+        if row is not None:
+            for k, w in enumerate(row):
+                scores[k] += w * scale
+    return scores
+
+
+def evaluate(results, temperature):
+    """Accuracy, log loss, expected calibration error and coverage at MIN_CONFIDENCE."""
+    rows = []
+    for scores, y in results:
+        probs = softmax(scores, temperature)
+        best = probs.index(max(probs))
+        rows.append((probs[best], best == y, probs[y]))
+
+    ece = 0.0
+    for b in range(CALIBRATION_BINS):
+        low, high = b / CALIBRATION_BINS, (b + 1) / CALIBRATION_BINS
+        in_bin = [r for r in rows if low < r[0] <= high]
+        if in_bin:
+            confidence = sum(r[0] for r in in_bin) / len(in_bin)
+            accuracy = sum(r[1] for r in in_bin) / len(in_bin)
+            ece += len(in_bin) / len(rows) * abs(confidence - accuracy)
+
+    confident = [r for r in rows if r[0] >= MIN_CONFIDENCE]
+    return {
+        "accuracy": sum(r[1] for r in rows) / len(rows),
+        "log_loss": -sum(math.log(max(r[2], 1e-12)) for r in rows) / len(rows),
+        "ece": ece,
+        "mean_confidence": sum(r[0] for r in rows) / len(rows),
+        "coverage": len(confident) / len(rows),
+        "precision": sum(r[1] for r in confident) / len(confident) if confident else 0.0,
+    }
+
+
+def fit_temperature(results):
+    """
+    Temperature minimizing log loss on out-of-fold scores, never below 1:
+    the training pages are cleaner than real sites, so they may soften
+    confidences but not sharpen them (which would also make off-topic text
+    look certain).
+    """
+    candidates = [t / 20 for t in range(20, 61)]
+    return min(candidates, key=lambda t: evaluate(results, t)["log_loss"])
+
+
+def report(name, metrics):
+    print(
+        f"{name}: accuracy {metrics['accuracy']:.0%}  log loss {metrics['log_loss']:.3f}  "
+        f"ECE {metrics['ece']:.3f}  mean confidence {metrics['mean_confidence']:.2f}  "
+        f">= {MIN_CONFIDENCE}: {metrics['coverage']:.0%} of pages at {metrics['precision']:.0%} precision"
+    )
+
+
+def main(pages_path=PAGES_PATH, snippets_path=SNIPPETS_PATH):
+    rng = random.Random(SEED)
+    pages = load(pages_path)
+    snippets = load(snippets_path)
+    labels = sorted({ex["label"] for ex in pages})
+
+    # Cross-validate over whole pages: each page is scored by a model that
+    # never saw it (nor any synthetic page built from its sentences).
+    by_label = defaultdict(list)
+    for ex in pages:
+        by_label[ex["label"]].append(ex)
+    folds = [[] for _ in range(FOLDS)]
+    for examples in by_label.values():
+        for i, ex in enumerate(examples):
+            folds[i % FOLDS].append(ex)
+
+    results = []
+    for k, held_out in enumerate(folds):
+        print(f"-- fold {k + 1}/{FOLDS}")
+        train_pages = [ex for j, fold in enumerate(folds) if j != k for ex in fold]
+        bias, weights = train(augment(train_pages, snippets, rng), labels, rng)
+        results.extend((scores_for(bias, weights, ex["text"]), labels.index(ex["label"])) for ex in held_out)
+
+    temperature = fit_temperature(results)
+    report(f"cross-validated, {len(results)} pages", evaluate(results, 1.0))
+    report(f"calibrated (temperature {temperature:.2f})", evaluate(results, temperature))
+
+    bias, weights = train(augment(pages, snippets, rng), labels, rng)
+    # No brand signal at all: should land well below MIN_CONFIDENCE.
+    probs = softmax(scores_for(bias, weights, " ".join(BOILERPLATE)), temperature)
+    print(f"boilerplate-only page: top confidence {max(probs):.2f}")
+    artifact = {
+        "labels": labels,
+        "n_features": N_FEATURES,
+        "temperature": temperature,
+        "bias": [round(b, 4) for b in bias],
+        "weights": {
+            str(i): [round(w, 4) for w in row]
+            for i, row in sorted(weights.items())
+            if any(abs(w) >= 1e-3 for w in row)
+        },
+    }
+    with open(ARTIFACT_PATH, "w") as f:
+        json.dump(artifact, f, separators=(",", ":"))
+    print(f"wrote {ARTIFACT_PATH} ({len(artifact['weights'])} features)")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
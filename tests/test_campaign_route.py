@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes import campaign
+from app.schemas import BrandProfile, GeneratedPost
+from app.services.scheduler import BATCH, request_admission
+from app.services.scraper import ScrapeResult
+
+CAMPAIGN = {
+    "url": "https://example.com",
+    "counts": {"Instagram": 1},
+    "start_date": "2026-01-01",
+    "end_date": "2026-01-31",
+}
+
+
+def _scope(spec_version):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": spec_version},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/campaign",
+        "raw_path": b"/campaign",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"x-api-key", b"k")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+
+
+def _receive_body_then_disconnect():
+    messages = [{"type": "http.request", "body": json.dumps(CAMPAIGN).encode(), "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+def _in_flight():
+    return request_admission.metrics()["in_flight_by_tenant"]
+
+
+@pytest.mark.parametrize("spec_version", ["2.4", "2.0"])
+def test_admission_released_when_client_leaves_before_streaming(spec_version):
+    async def send(message):
+        if message["type"] == "http.response.start":
+            raise OSError("client gone")
+
+    async def run():
+        try:
+            await app(_scope(spec_version), _receive_body_then_disconnect(), send)
+        except Exception:
+            pass  # ClientDisconnect / OSError, depending on the ASGI spec path
+
+    asyncio.run(run())
+    assert "k" not in _in_flight()
+
+
+def _stub_campaign(monkeypatch):
+    """Replace the pipeline with canned results; returns generate_campaign's kwargs once called."""
+    captured = {}
+    profile = BrandProfile(
+        brand_name="Acme", description="d", products_services=[], target_audience=[],
+        tone="t", keywords=[], colors=[],
+    )
+    post = GeneratedPost(platform="Instagram", caption="c", hashtags=[], cta="x", tone="t", engagement_score_label="High")
+    monkeypatch.setattr(campaign, "scrape_website", lambda url, fallback_text=None: ScrapeResult("text", {}))
+    monkeypatch.setattr(campaign, "resolve_tone_preset", lambda text, preset: "cafe")
+    monkeypatch.setattr(campaign, "generate_brand_profile", lambda *args, **kwargs: profile)
+
+    def fake_campaign(*args, **kwargs):
+        captured.update(kwargs)
+        return iter([[post]])
+
+    monkeypatch.setattr(campaign, "generate_campaign", fake_campaign)
+    return captured
+
+
+def test_admission_released_after_full_stream(monkeypatch):
+    _stub_campaign(monkeypatch)
+    response = TestClient(app).post("/campaign", json=CAMPAIGN, headers={"X-API-Key": "k"})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["type"] for line in lines] == ["brand_profile", "posts", "done"]
+    assert "k" not in _in_flight()
+
+
+def test_campaign_ignores_x_priority(monkeypatch):
+    captured = _stub_campaign(monkeypatch)
+    TestClient(app).post("/campaign", json=CAMPAIGN, headers={"X-API-Key": "k", "X-Priority": "interactive"})
+    assert captured["lane"] == BATCH
@@ -0,0 +1,155 @@
+import threading
+import time
+
+import pytest
+
+from app.services.scheduler import BATCH, DEFAULT_TENANT, INTERACTIVE, FairScheduler, QueueTimeout, client_tenant
+
+
+def _wait_for_queue(scheduler, depth, lane=None, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        lanes = scheduler.metrics()["lanes"]
+        queued = lanes[lane]["queue_depth"] if lane else sum(l["queue_depth"] for l in lanes.values())
+        if queued == depth:
+            return
+        time.sleep(0.005)
+    raise AssertionError(f"queue never reached depth {depth}")
+
+
+def _enqueue(scheduler, order, label, **acquire_kwargs):
+    """Start a thread that takes a slot, records `label`, and releases it."""
+    def run():
+        with scheduler.acquire(**acquire_kwargs):
+            order.append(label)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_interactive_lane_is_served_before_batch():
+    scheduler = FairScheduler("test", max_concurrency=1, tenant_concurrency=1, interactive_reserve=0)
+    order = []
+    with scheduler.acquire(tenant="holder", lane=INTERACTIVE):
+        threads = [_enqueue(scheduler, order, "batch", tenant="a", lane=BATCH)]
+        _wait_for_queue(scheduler, 1, BATCH)
+        threads.append(_enqueue(scheduler, order, "interactive", tenant="b", lane=INTERACTIVE))
+        _wait_for_queue(scheduler, 1, INTERACTIVE)
+    for thread in threads:
+        thread.join(2)
+    assert order == ["interactive", "batch"]
+
+
+def test_interactive_reserve_is_never_given_to_batch():
+    scheduler = FairScheduler("test", max_concurrency=2, tenant_concurrency=2, interactive_reserve=1)
+    with scheduler.acquire(tenant="a", lane=BATCH):
+        scheduler.queue_timeout = {BATCH: 0.05}
+        with pytest.raises(QueueTimeout):
+            with scheduler.acquire(tenant="b", lane=BATCH):
+                pass
+        with scheduler.acquire(tenant="c", lane=INTERACTIVE):
+            assert scheduler.metrics()["running"] == 2
+
+
+def test_weights_share_slots_proportionally():
+    scheduler = FairScheduler("test", max_concurrency=1, tenant_concurrency=1, weights={"heavy": 3})
+    order = []
+    threads = []
+    with scheduler.acquire(tenant="holder"):
+        for i in range(4):
+            for tenant in ("light", "heavy"):
+                threads.append(_enqueue(scheduler, order, tenant, est_tokens=100, tenant=tenant))
+                _wait_for_queue(scheduler, len(threads))
+    for thread in threads:
+        thread.join(2)
+    assert order[0] == "heavy"
+    assert order[:4].count("heavy") == 3
+
+
+def test_tenant_concurrency_lets_other_tenants_through():
+    scheduler = FairScheduler("test", max_concurrency=3, tenant_concurrency=1, interactive_reserve=0)
+    order = []
+    with scheduler.acquire(tenant="a"):
+        thread = _enqueue(scheduler, order, "a", tenant="a")
+        _wait_for_queue(scheduler, 1)
+        with scheduler.acquire(tenant="b"):
+            assert order == []
+            assert scheduler.metrics()["running_by_tenant"] == {"a": 1, "b": 1}
+    thread.join(2)
+    assert order == ["a"]
+
+
+def test_token_quota_blocks_until_refilled():
+    scheduler = FairScheduler(
+        "test", max_concurrency=2, tenant_concurrency=2,
+        tenant_tokens_per_minute=600, queue_timeout={INTERACTIVE: 0.1},
+    )
+    with scheduler.acquire(est_tokens=600, tenant="a"):
+        pass
+    # Bucket is empty: 300 tokens need ~30s of refill, far past the timeout.
+    with pytest.raises(QueueTimeout) as excinfo:
+        with scheduler.acquire(est_tokens=300, tenant="a"):
+            pass
+    assert excinfo.value.retry_after > 1
+    # Other tenants have their own bucket.
+    with scheduler.acquire(est_tokens=300, tenant="b"):
+        pass
+
+
+def test_record_usage_refunds_overestimates():
+    scheduler = FairScheduler(
+        "test", max_concurrency=1, tenant_concurrency=1,
+        tenant_tokens_per_minute=600, queue_timeout={INTERACTIVE: 0.1},
+    )
+    with scheduler.acquire(est_tokens=600, tenant="a") as slot:
+        slot.record_usage(100)
+    with scheduler.acquire(est_tokens=400, tenant="a"):
+        pass
+
+
+def test_queue_timeout_removes_the_ticket():
+    scheduler = FairScheduler("test", max_concurrency=1, tenant_concurrency=1, queue_timeout={BATCH: 0.05})
+    with scheduler.acquire(tenant="a", lane=INTERACTIVE):
+        started = time.monotonic()
+        with pytest.raises(QueueTimeout):
+            with scheduler.acquire(tenant="b", lane=BATCH):
+                pass
+        assert time.monotonic() - started < 1
+    metrics = scheduler.metrics()
+    assert metrics["lanes"][BATCH]["timed_out"] == 1
+    assert metrics["lanes"][BATCH]["queue_depth"] == 0
+    with scheduler.acquire(tenant="b", lane=BATCH):
+        pass
+
+
+def test_keyless_callers_are_tenants_per_client_address():
+    assert client_tenant("agency-key", "10.0.0.1") == "agency-key"
+    assert client_tenant(None, "10.0.0.1") == "anonymous:10.0.0.1"
+    assert client_tenant(None, "10.0.0.2") != client_tenant(None, "10.0.0.1")
+    assert client_tenant(None, None) == DEFAULT_TENANT
+    # A key can't claim another client's anonymous identity.
+    assert client_tenant("anonymous:10.0.0.1", "10.0.0.9") == "anonymous:10.0.0.9"
+
+
+def test_idle_tenants_are_forgotten():
+    scheduler = FairScheduler("test", max_concurrency=1, tenant_concurrency=1, tenant_tokens_per_minute=600000)
+    scheduler.prune_interval = 0
+    for i in range(100):
+        with scheduler.acquire(est_tokens=1, tenant=f"key-{i}"):
+            pass
+        time.sleep(0.001)  # long enough to refill a 1-token draw
+    assert scheduler.metrics()["tracked_tenants"] <= 2
+
+
+def test_pruning_keeps_drained_quotas():
+    scheduler = FairScheduler(
+        "test", max_concurrency=1, tenant_concurrency=1,
+        tenant_tokens_per_minute=600, queue_timeout={INTERACTIVE: 0.05},
+    )
+    scheduler.prune_interval = 0
+    with scheduler.acquire(est_tokens=600, tenant="a"):
+        pass
+    with pytest.raises(QueueTimeout):
+        with scheduler.acquire(est_tokens=300, tenant="a"):
+            pass
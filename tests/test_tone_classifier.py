@@ -0,0 +1,30 @@
+import json
+
+from app.services.tone_classifier import MIN_WORDS, get_classifier, resolve_tone_preset
+
+# What scraper.py returns when both scraping and the LLM fallback fail.
+CANNED_FALLBACK = "A business website at example.com offering products and services to customers."
+
+
+def _pages(label):
+    with open("scripts/data/tone_pages.jsonl") as f:
+        return [ex["text"] for ex in map(json.loads, f) if ex["label"] == label]
+
+
+def test_short_or_empty_text_stays_auto():
+    assert resolve_tone_preset("", "auto") == "auto"
+    assert resolve_tone_preset(None, None) == "auto"
+    assert resolve_tone_preset("some text about coffee", "auto") == "auto"
+    assert resolve_tone_preset(CANNED_FALLBACK, "auto") == "auto"
+    assert len(CANNED_FALLBACK.split()) < MIN_WORDS
+
+
+def test_explicit_presets_pass_through():
+    assert resolve_tone_preset("", "NGO") == "ngo"
+
+
+def test_scraped_page_resolves_to_its_brand_type():
+    page = _pages("cafe")[0]
+    assert len(page.split()) >= MIN_WORDS
+    assert get_classifier() is not None
+    assert resolve_tone_preset(page, "auto") == "cafe"